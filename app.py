@@ -1,11 +1,20 @@
 from flask import Flask, request, g, render_template, session, redirect, url_for
+import copy
 import logging
 import json
-from datetime import datetime
+import orjson
+from datetime import datetime, timezone
 import socket
 import os
+import random
+import re
+import queue
 import sqlite3
-from logging.handlers import RotatingFileHandler
+import threading
+import time
+import zlib
+import atexit
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key')
@@ -13,29 +22,103 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Ensure logs directory exists
-os.makedirs('logs', exist_ok=True)
+LOG_DIR = os.environ.get('LOG_DIR', 'logs')
+os.makedirs(LOG_DIR, exist_ok=True)
 
 # Configure rotating file handler
 file_handler = RotatingFileHandler(
-    'logs/app.log', maxBytes=1024 * 1024 * 5, backupCount=3)
+    os.path.join(LOG_DIR, 'app.log'), maxBytes=1024 * 1024 * 5, backupCount=3)
 file_handler.setLevel(logging.INFO)
 file_handler.setFormatter(logging.Formatter(
     '%(asctime)s %(levelname)s %(name)s %(message)s'))
-logger.addHandler(file_handler)
+
+# Console output, formatted the same way basicConfig formats the root logger
+console_handler = logging.StreamHandler()
+console_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Enqueue records unformatted so msg % args runs on the listener thread"""
+
+    def prepare(self, record):
+        return record
+
+
+class JSONMessage:
+    """Log argument that is only serialized when the record is formatted.
+    It holds data by reference, so callers must pass a snapshot that nothing
+    mutates afterwards. The result is cached, since every handler formats
+    the record separately.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.rendered = None
+
+    def __str__(self):
+        if self.rendered is None:
+            try:
+                self.rendered = orjson.dumps(self.data, default=str).decode()
+            except orjson.JSONEncodeError:
+                # e.g. client-sent integers beyond 64 bits or deep nesting,
+                # which the stdlib encoder still handles
+                self.rendered = json.dumps(self.data, default=str)
+        return self.rendered
+
+
+# Request threads only enqueue LogRecords; formatting and file I/O happen on
+# the listener's background thread
+log_record_queue = queue.Queue(-1)
+logger.addHandler(DeferredQueueHandler(log_record_queue))
+logger.propagate = False
+log_listener = QueueListener(
+    log_record_queue, file_handler, console_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Comprehensive request capture only runs for eligible requests
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '1.0'))
+LOG_EXCLUDE_PATHS = frozenset(
+    os.environ.get('LOG_EXCLUDE_PATHS', '/favicon.ico,/healthz').split(','))
+LOG_MAX_CONTENT_LENGTH = int(
+    os.environ.get('LOG_MAX_CONTENT_LENGTH', str(1024 * 1024)))
+# Byte cap on the request body kept in both the log and request_logs.body
+LOG_MAX_BODY = 4 * 1024
 
 # SQLite setup
-DB_PATH = os.path.join(os.path.dirname(__file__), 'monitor.db')
+DB_PATH = os.environ.get(
+    'DB_PATH', os.path.join(os.path.dirname(__file__), 'monitor.db'))
 
 
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
+    # Autocommit mode; shared across request threads behind db_lock
+    conn = sqlite3.connect(
+        DB_PATH, check_same_thread=False, isolation_level=None)
     conn.row_factory = sqlite3.Row
+    # WAL + synchronous=NORMAL: commits append to the WAL and only fsync at
+    # checkpoint, so request logging no longer pays an fsync per INSERT
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
     return conn
 
 
+# INSERT statements shared by the background writer and the quiz route
+INSERT_REQUEST_LOG_SQL = (
+    "INSERT INTO request_logs (timestamp, method, path, status_code, ip, "
+    "user_agent, referer, headers_json, query_json, body) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+INSERT_QUIZ_SUBMISSION_SQL = (
+    "INSERT INTO quiz_submissions (timestamp, ip, user_agent, answers_json) "
+    "VALUES (?, ?, ?, ?)")
+
+# Single long-lived connection so requests don't pay connect/pragma setup
+db = get_db_connection()
+db_lock = threading.Lock()
+
+
 def init_db():
-    conn = get_db_connection()
-    cur = conn.cursor()
+    cur = db.cursor()
+    cur.execute('PRAGMA temp_store=MEMORY')
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS request_logs (
@@ -64,24 +147,159 @@ def init_db():
         )
         """
     )
-    conn.commit()
-    conn.close()
 
 
 init_db()
 
+# Request logs and quiz submissions are queued by the request thread and
+# written in batches by a background writer, so many INSERTs share one
+# transaction/commit
+LOG_BATCH_SIZE = 500
+LOG_FLUSH_INTERVAL = 0.1  # seconds
+# Bodiless probes that aren't worth a request_logs row
+LOG_SKIP_METHODS = frozenset(['HEAD', 'OPTIONS'])
+# request_logs is kept as a ring buffer of the newest rows, pruned every
+# LOG_PRUNE_EVERY batches
+LOG_RETAIN_ROWS = int(os.environ.get('LOG_RETAIN_ROWS', '100000'))
+LOG_PRUNE_EVERY = 100
+write_queue = queue.Queue()  # (sql, row) pairs
+
+
+def format_timestamp_ns(ns):
+    """Render a time.time_ns() value the way the DB has always stored it"""
+    return datetime.fromtimestamp(
+        ns / 1e9, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def write_rows(items):
+    # Rows lead with a raw time.time_ns() value; format it here, off the
+    # request thread
+    batches = {}
+    for sql, row in items:
+        batches.setdefault(sql, []).append(
+            (format_timestamp_ns(row[0]),) + row[1:])
+    with db_lock:
+        db.execute('BEGIN')
+        try:
+            for sql, rows in batches.items():
+                db.executemany(sql, rows)
+            db.execute('COMMIT')
+        except Exception:
+            db.execute('ROLLBACK')
+            raise
+
+
+def prune_request_logs():
+    """Drop rows beyond LOG_RETAIN_ROWS and truncate the WAL file"""
+    with db_lock:
+        db.execute(
+            "DELETE FROM request_logs WHERE id <= "
+            "(SELECT MAX(id) FROM request_logs) - ?",
+            (LOG_RETAIN_ROWS,),
+        )
+        db.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+
+def db_writer():
+    batches = 0
+    stopping = False
+    while not stopping:
+        item = write_queue.get()
+        if item is None:
+            break
+        items = [item]
+        deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+        while len(items) < LOG_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = write_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                stopping = True
+                break
+            items.append(item)
+        try:
+            write_rows(items)
+        except Exception as e:
+            logger.exception("Failed to persist queued rows: %s", e)
+        batches += 1
+        if batches % LOG_PRUNE_EVERY == 0:
+            try:
+                prune_request_logs()
+            except Exception as e:
+                logger.exception("Failed to prune request logs: %s", e)
+
+
+def stop_db_writer():
+    """Let the writer drain the queue before the process exits"""
+    write_queue.put(None)
+    db_writer_thread.join(timeout=5)
+
+
+db_writer_thread = threading.Thread(target=db_writer, daemon=True)
+db_writer_thread.start()
+atexit.register(stop_db_writer)
+
+
+# Specific WSGI environ variables that might be interesting
+INTERESTING_ENVIRON = frozenset([
+    'HTTP_X_FORWARDED_FOR', 'HTTP_X_REAL_IP', 'HTTP_X_FORWARDED_PROTO',
+    'HTTP_CF_RAY', 'HTTP_CF_CONNECTING_IP', 'HTTP_CF_IPCOUNTRY',
+    'HTTP_CF_VISITOR', 'REMOTE_HOST', 'REMOTE_USER', 'AUTH_TYPE',
+    'REQUEST_METHOD', 'SCRIPT_NAME', 'PATH_INFO', 'QUERY_STRING',
+    'CONTENT_TYPE', 'CONTENT_LENGTH', 'SERVER_NAME', 'SERVER_PORT',
+    'SERVER_PROTOCOL', 'HTTP_HOST', 'HTTP_USER_AGENT', 'HTTP_REFERER',
+    'HTTP_COOKIE', 'HTTP_AUTHORIZATION', 'HTTP_ACCEPT', 'HTTP_ACCEPT_LANGUAGE',
+    'HTTP_ACCEPT_ENCODING', 'HTTP_CONNECTION', 'HTTP_CACHE_CONTROL',
+    'HTTP_PRAGMA', 'HTTP_UPGRADE_INSECURE_REQUESTS', 'HTTP_SEC_FETCH_DEST',
+    'HTTP_SEC_FETCH_MODE', 'HTTP_SEC_FETCH_SITE', 'HTTP_SEC_FETCH_USER',
+    'HTTP_SEC_CH_UA', 'HTTP_SEC_CH_UA_MOBILE', 'HTTP_SEC_CH_UA_PLATFORM',
+    'HTTP_DNT', 'HTTP_ACCEPT_DATETIME', 'HTTP_IF_MODIFIED_SINCE',
+    'HTTP_IF_NONE_MATCH', 'HTTP_IF_RANGE', 'HTTP_RANGE',
+    'HTTP_X_REQUESTED_WITH', 'HTTP_X_CSRF_TOKEN', 'HTTP_X_API_KEY',
+    'HTTP_X_AUTH_TOKEN', 'HTTP_X_SESSION_ID', 'HTTP_X_REQUEST_ID',
+    'HTTP_X_CORRELATION_ID', 'HTTP_X_TRACE_ID', 'HTTP_X_SPAN_ID',
+    'HTTP_X_FORWARDED_HOST', 'HTTP_X_FORWARDED_PORT',
+    'HTTP_X_FORWARDED_SERVER', 'HTTP_X_ORIGINAL_URL', 'HTTP_X_REWRITE_URL',
+    'HTTP_X_HTTP_METHOD_OVERRIDE', 'HTTP_X_HTTP_VERSION', 'HTTP_X_HTTPS',
+    'HTTP_X_SCHEME', 'HTTP_X_FORWARDED_SSL', 'HTTP_X_CLUSTER_CLIENT_IP',
+    'HTTP_X_CLIENT_IP', 'HTTP_X_ORIGINAL_FORWARDED_FOR', 'HTTP_X_FORWARDED'
+])
+
 
 @app.before_request
 def comprehensive_logging():
     """Capture comprehensive request information safely"""
-    g.start_time = datetime.now()
+    g.start_ns = time.time_ns()
+
+    if not should_capture_request():
+        return
 
     # Get ALL headers safely
-    all_headers = dict(request.headers)
+    all_headers = request_headers()
 
-    # Enhanced request info with safe attribute access
+    # Single pass over environ: keys, interesting variables, and all HTTP
+    # headers (comprehensive approach)
+    environ_keys = []
+    environ_data = {}
+    http_headers = {}
+    for key, value in request.environ.items():
+        environ_keys.append(key)
+        if key in INTERESTING_ENVIRON and value:
+            environ_data[key] = value
+        if key.startswith('HTTP_'):
+            # Convert HTTP_HEADER_NAME to Header-Name format
+            header_name = key[5:].replace('_', '-').title()
+            http_headers[header_name] = value
+
+    # Enhanced request info with safe attribute access. It is serialized
+    # later on the log listener thread, so mutable values must be copies
+    # rather than objects the view can still change.
     request_info = {
-        'timestamp': g.start_time.isoformat(),
+        'timestamp': g.start_ns,
 
         # Request basics
         'method': request.method,
@@ -92,7 +310,7 @@ def comprehensive_logging():
         'form_data': dict(request.form) if request.form else None,
 
         # All headers
-        'headers': all_headers,
+        'headers': dict(all_headers),
         'header_count': len(all_headers),
 
         # Network info
@@ -113,7 +331,7 @@ def comprehensive_logging():
         'user_agent_info': parse_user_agent(),
 
         # Environment info
-        'environ_keys': list(request.environ.keys()),
+        'environ_keys': environ_keys,
         'wsgi_version': request.environ.get('wsgi.version'),
         'server_software': request.environ.get('SERVER_SOFTWARE'),
 
@@ -126,72 +344,20 @@ def comprehensive_logging():
     # Add JSON body if present and safe to access
     try:
         if hasattr(request, 'is_json') and request.is_json:
-            request_info['json_body'] = request.get_json()
+            # The view gets the same object; snapshot it so the log shows the
+            # body as received even after the view mutates it
+            request_info['json_body'] = copy.deepcopy(request.get_json())
     except Exception as e:
         request_info['json_body'] = f'Could not parse JSON: {str(e)}'
 
-    # Add specific WSGI environ variables that might be interesting
-    interesting_environ = [
-        'HTTP_X_FORWARDED_FOR', 'HTTP_X_REAL_IP', 'HTTP_X_FORWARDED_PROTO',
-        'HTTP_CF_RAY', 'HTTP_CF_CONNECTING_IP', 'HTTP_CF_IPCOUNTRY',
-        'HTTP_CF_VISITOR', 'HTTP_CF_RAY', 'HTTP_CF_CONNECTING_IP',
-        'REMOTE_HOST', 'REMOTE_USER', 'AUTH_TYPE',
-        'REQUEST_METHOD', 'SCRIPT_NAME', 'PATH_INFO',
-        'QUERY_STRING', 'CONTENT_TYPE', 'CONTENT_LENGTH',
-        'SERVER_NAME', 'SERVER_PORT', 'SERVER_PROTOCOL',
-        'HTTP_HOST', 'HTTP_USER_AGENT', 'HTTP_REFERER',
-        'HTTP_COOKIE', 'HTTP_AUTHORIZATION', 'HTTP_ACCEPT',
-        'HTTP_ACCEPT_LANGUAGE', 'HTTP_ACCEPT_ENCODING',
-        'HTTP_CONNECTION', 'HTTP_CACHE_CONTROL', 'HTTP_PRAGMA',
-        'HTTP_UPGRADE_INSECURE_REQUESTS', 'HTTP_SEC_FETCH_DEST',
-        'HTTP_SEC_FETCH_MODE', 'HTTP_SEC_FETCH_SITE', 'HTTP_SEC_FETCH_USER',
-        'HTTP_SEC_CH_UA', 'HTTP_SEC_CH_UA_MOBILE', 'HTTP_SEC_CH_UA_PLATFORM',
-        'HTTP_DNT', 'HTTP_ACCEPT_DATETIME', 'HTTP_IF_MODIFIED_SINCE',
-        'HTTP_IF_NONE_MATCH', 'HTTP_IF_RANGE', 'HTTP_RANGE',
-        'HTTP_X_REQUESTED_WITH', 'HTTP_X_CSRF_TOKEN', 'HTTP_X_API_KEY',
-        'HTTP_X_AUTH_TOKEN', 'HTTP_X_SESSION_ID', 'HTTP_X_REQUEST_ID',
-        'HTTP_X_CORRELATION_ID', 'HTTP_X_TRACE_ID', 'HTTP_X_SPAN_ID',
-        'HTTP_X_FORWARDED_HOST', 'HTTP_X_FORWARDED_PORT', 'HTTP_X_FORWARDED_SERVER',
-        'HTTP_X_ORIGINAL_URL', 'HTTP_X_REWRITE_URL', 'HTTP_X_HTTP_METHOD_OVERRIDE',
-        'HTTP_X_HTTP_VERSION', 'HTTP_X_HTTPS', 'HTTP_X_SCHEME',
-        'HTTP_X_FORWARDED_SSL', 'HTTP_X_FORWARDED_PROTO', 'HTTP_X_FORWARDED_FOR',
-        'HTTP_X_CLUSTER_CLIENT_IP', 'HTTP_X_CLIENT_IP', 'HTTP_X_REAL_IP',
-        'HTTP_X_ORIGINAL_FORWARDED_FOR', 'HTTP_X_FORWARDED', 'HTTP_X_CLUSTER_CLIENT_IP',
-        'HTTP_X_FORWARDED_FOR', 'HTTP_X_FORWARDED_HOST', 'HTTP_X_FORWARDED_SERVER',
-        'HTTP_X_FORWARDED_PORT', 'HTTP_X_ORIGINAL_URL', 'HTTP_X_REWRITE_URL',
-        'HTTP_X_HTTP_METHOD_OVERRIDE', 'HTTP_X_HTTP_VERSION', 'HTTP_X_HTTPS',
-        'HTTP_X_SCHEME', 'HTTP_X_FORWARDED_SSL', 'HTTP_X_FORWARDED_PROTO',
-        'HTTP_X_FORWARDED_FOR', 'HTTP_X_CLUSTER_CLIENT_IP', 'HTTP_X_CLIENT_IP',
-        'HTTP_X_REAL_IP', 'HTTP_X_ORIGINAL_FORWARDED_FOR', 'HTTP_X_FORWARDED',
-        'HTTP_X_CLUSTER_CLIENT_IP', 'HTTP_X_FORWARDED_FOR', 'HTTP_X_FORWARDED_HOST',
-        'HTTP_X_FORWARDED_SERVER', 'HTTP_X_FORWARDED_PORT', 'HTTP_X_ORIGINAL_URL',
-        'HTTP_X_REWRITE_URL', 'HTTP_X_HTTP_METHOD_OVERRIDE', 'HTTP_X_HTTP_VERSION',
-        'HTTP_X_HTTPS', 'HTTP_X_SCHEME', 'HTTP_X_FORWARDED_SSL', 'HTTP_X_FORWARDED_PROTO'
-    ]
-
-    environ_data = {}
-    for key in interesting_environ:
-        value = request.environ.get(key)
-        if value:
-            environ_data[key] = value
-
-    # Add all HTTP headers from environ (comprehensive approach)
-    http_headers = {}
-    for key, value in request.environ.items():
-        if key.startswith('HTTP_'):
-            # Convert HTTP_HEADER_NAME to Header-Name format
-            header_name = key[5:].replace('_', '-').title()
-            http_headers[header_name] = value
-
     request_info['environ_data'] = environ_data
     request_info['http_headers_from_environ'] = http_headers
-    request_info['all_environ_keys'] = list(request.environ.keys())
 
     # Add request data if present
     try:
-        if request.data:
-            request_info['raw_data'] = request.data.decode(
-                'utf-8', errors='replace')
+        body_text = request_body_text()
+        if body_text:
+            request_info['raw_data'] = body_text
     except Exception as e:
         request_info['raw_data'] = f'Could not decode raw data: {str(e)}'
 
@@ -206,47 +372,75 @@ def comprehensive_logging():
             }
         request_info['files'] = files_info
 
-    logger.info(
-        f"COMPREHENSIVE REQUEST: {json.dumps(request_info, indent=2, default=str)}")
+    logger.info("COMPREHENSIVE REQUEST: %s", JSONMessage(request_info))
 
 
 @app.after_request
 def log_to_db(response):
+    if request.method in LOG_SKIP_METHODS or is_excluded_path():
+        return response
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        headers_json = json.dumps(dict(request.headers), default=str)
-        query_json = json.dumps(dict(request.args), default=str)
+        headers = request_headers()
+        # Empty dicts are stored as NULL rather than encoded
+        headers_json = (orjson.dumps(headers, default=str).decode()
+                        if headers else None)
+        args = request.args.to_dict()
+        query_json = orjson.dumps(args, default=str).decode() if args else None
         try:
-            body_text = request.get_data(cache=False, as_text=True)
+            body_text = request_body_text()
         except Exception:
             body_text = None
-        cur.execute(
-            """
-            INSERT INTO request_logs (
-                timestamp, method, path, status_code, ip, user_agent, referer, headers_json, query_json, body
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                datetime.utcnow().isoformat(),
-                request.method,
-                request.path,
-                response.status_code,
-                request.remote_addr,
-                request.headers.get('User-Agent'),
-                request.headers.get('Referer'),
-                headers_json,
-                query_json,
-                body_text,
-            ),
-        )
-        conn.commit()
-        conn.close()
+        write_queue.put_nowait((INSERT_REQUEST_LOG_SQL, (
+            g.start_ns,
+            request.method,
+            request.path,
+            response.status_code,
+            request.remote_addr,
+            headers.get('User-Agent'),
+            headers.get('Referer'),
+            headers_json,
+            query_json,
+            body_text,
+        )))
     except Exception as e:
-        logger.exception(f"Failed to persist request log: {e}")
+        logger.exception("Failed to queue request log: %s", e)
     return response
 
 
+def request_headers():
+    """Copy the request headers into a dict once and reuse it via g"""
+    if 'headers' not in g:
+        g.headers = dict(request.headers)
+    return g.headers
+
+
+def request_body_text():
+    """Decode the (truncated) request body once and reuse it via g"""
+    if 'body_text' not in g:
+        # Same bytes as request.data: form bodies are parsed, not logged raw
+        g.body_text = request.get_data(parse_form_data=True)[
+            :LOG_MAX_BODY].decode('utf-8', errors='replace')
+    return g.body_text
+
+
+def is_excluded_path():
+    """Health checks, favicon and static files are never logged"""
+    return (request.path in LOG_EXCLUDE_PATHS
+            or request.path.startswith(app.static_url_path + '/'))
+
+
+def should_capture_request():
+    """Skip excluded paths, static files, oversized bodies and unsampled hits"""
+    # Nothing would be emitted, so don't build the payload at all
+    if not logger.isEnabledFor(logging.INFO):
+        return False
+    if is_excluded_path():
+        return False
+    if (request.content_length or 0) > LOG_MAX_CONTENT_LENGTH:
+        return False
+    return LOG_SAMPLE_RATE >= 1 or random.random() < LOG_SAMPLE_RATE
+
+
 def get_client_ip():
     """Get real client IP from various headers"""
     # Check common proxy headers
@@ -257,27 +451,33 @@ def get_client_ip():
     return request.remote_addr
 
 
+# Every User-Agent token we classify on, matched in a single scan. The
+# lookahead makes matches zero-width, so tokens that overlap (e.g. the
+# 'iphone' in 'Safariphone') are all found, like the old substring checks.
+USER_AGENT_RE = re.compile(
+    r'(?=(Chrome|Firefox|Safari|Edge|mobile|android|iphone|ipad|bot|crawler|spider|scraper))',
+    re.IGNORECASE)
+MOBILE_TOKENS = frozenset(['mobile', 'android', 'iphone', 'ipad'])
+BOT_TOKENS = frozenset(['bot', 'crawler', 'spider', 'scraper'])
+# Browser names are matched case-sensitively, in priority order
+BROWSERS = ('Chrome', 'Firefox', 'Safari', 'Edge')
+
+
 def parse_user_agent():
     """Extract more info from User-Agent"""
-    ua = request.headers.get('User-Agent', '')
+    ua = request_headers().get('User-Agent', '')
+    tokens = {match.group(1) for match in USER_AGENT_RE.finditer(ua)}
+    lowered = {token.lower() for token in tokens}
 
     info = {
         'raw': ua,
-        'is_mobile': any(mobile in ua.lower() for mobile in ['mobile', 'android', 'iphone', 'ipad']),
-        'is_bot': any(bot in ua.lower() for bot in ['bot', 'crawler', 'spider', 'scraper']),
+        'is_mobile': not MOBILE_TOKENS.isdisjoint(lowered),
+        'is_bot': not BOT_TOKENS.isdisjoint(lowered),
     }
 
     # Basic browser detection
-    if 'Chrome' in ua:
-        info['browser'] = 'Chrome'
-    elif 'Firefox' in ua:
-        info['browser'] = 'Firefox'
-    elif 'Safari' in ua and 'Chrome' not in ua:
-        info['browser'] = 'Safari'
-    elif 'Edge' in ua:
-        info['browser'] = 'Edge'
-    else:
-        info['browser'] = 'Unknown'
+    info['browser'] = next(
+        (name for name in BROWSERS if name in tokens), 'Unknown')
 
     return info
 
@@ -289,7 +489,7 @@ def home():
 
 def get_quiz_questions():
     # Humorous, privacy-satire questions that DO NOT ask for real secrets
-    # Stored in session for this demo (not persisted)
+    # Built once at import as QUIZ_QUESTIONS (not persisted)
     return [
         {
             'id': 'q1',
@@ -345,39 +545,30 @@ def get_quiz_questions():
     ]
 
 
+QUIZ_QUESTIONS = get_quiz_questions()
+
+
 @app.route('/quiz', methods=['GET', 'POST'])
 def quiz():
     if request.method == 'GET':
-        # Always refresh questions so code changes are reflected immediately
-        session['quiz_questions'] = get_quiz_questions()
-        return render_template('quiz.html', questions=session['quiz_questions'])
+        return render_template('quiz.html', questions=QUIZ_QUESTIONS)
 
     # POST: collect answers
     answers = {}
-    for question in session.get('quiz_questions', []):
+    for question in QUIZ_QUESTIONS:
         qid = question['id']
         answers[qid] = request.form.get(qid)
 
-    # Persist submission
+    # Persist submission via the background writer
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO quiz_submissions (timestamp, ip, user_agent, answers_json)
-            VALUES (?, ?, ?, ?)
-            """,
-            (
-                datetime.utcnow().isoformat(),
-                request.remote_addr,
-                request.headers.get('User-Agent'),
-                json.dumps(answers, default=str),
-            ),
-        )
-        conn.commit()
-        conn.close()
+        write_queue.put_nowait((INSERT_QUIZ_SUBMISSION_SQL, (
+            time.time_ns(),
+            request.remote_addr,
+            request_headers().get('User-Agent'),
+            orjson.dumps(answers, default=str).decode(),
+        )))
     except Exception as e:
-        logger.exception(f"Failed to persist quiz submission: {e}")
+        logger.exception("Failed to queue quiz submission: %s", e)
 
     session['quiz_answers'] = answers
     return redirect(url_for('quiz_results'))
@@ -385,74 +576,70 @@ def quiz():
 
 @app.route('/quiz/reset')
 def quiz_reset():
-    session.pop('quiz_questions', None)
     session.pop('quiz_answers', None)
     return redirect(url_for('quiz'))
 
 
 @app.route('/quiz/results')
 def quiz_results():
-    questions = session.get('quiz_questions', [])
     answers = session.get('quiz_answers', {})
     profile = determine_animal_profile(answers)
-    return render_template('results.html', questions=questions, answers=answers, profile=profile)
+    return render_template('results.html', questions=QUIZ_QUESTIONS, answers=answers, profile=profile)
+
+
+ANIMAL_PROFILES = [
+    {
+        'name': 'Red Panda',
+        'emoji': '🦝',
+        'tagline': "Cozy, curious, and criminally cute",
+        'description': "You thrive on vibes and soft blankets. Youre a gentle introvert who still knows how to steal the spotlight  mostly with snacks.",
+        'traits': ['Cozy-core', 'Snack-forward', 'Camera-ready'],
+    },
+    {
+        'name': 'Otter',
+        'emoji': '🦦',
+        'tagline': "Play first, plan… eventually",
+        'description': "Youre collaborative, chaotic-good, and find joy in little things (like holding hands and river slides).",
+        'traits': ['Playful', 'Social', 'Inventive'],
+    },
+    {
+        'name': 'Quokka',
+        'emoji': '🦘',
+        'tagline': "A smile with legs",
+        'description': "Your optimism is contagious and slightly suspicious. People feel safer just by standing near you.",
+        'traits': ['Optimistic', 'Disarming', 'Unflappable'],
+    },
+    {
+        'name': 'Axolotl',
+        'emoji': '🦎',
+        'tagline': "Soft chaos scientist",
+        'description': "Youre adaptable, adorable, and unbothered. If vibes were a PhD, youd be tenured.",
+        'traits': ['Adaptive', 'Serene', 'Mysteriously wise'],
+    },
+    {
+        'name': 'Corgi',
+        'emoji': '🐶',
+        'tagline': "Short king energy",
+        'description': "You lead with enthusiasm and snack diplomacy. Your calendar is 50% walks, 50% parties.",
+        'traits': ['Loyal', 'Upbeat', 'Snack-positive'],
+    },
+    {
+        'name': 'Penguin',
+        'emoji': '🐧',
+        'tagline': "Formalwear, informal chaos",
+        'description': "Youre elegant under pressure and hilarious on land. Teamwork is your superpower.",
+        'traits': ['Graceful', 'Team-first', 'Resilient'],
+    },
+]
 
 
 def determine_animal_profile(answers: dict) -> dict:
     """Return a fun, BuzzFeed-style animal profile based on answers.
     Uses a simple deterministic hash so the same answers yield the same animal.
     """
-    # Build a stable seed from answers
-    concat = "|".join(f"{k}:{v}" for k, v in sorted(answers.items()))
-    seed = sum(ord(c) for c in concat) % 1000
-
-    animal_profiles = [
-        {
-            'name': 'Red Panda',
-            'emoji': '🦝',
-            'tagline': "Cozy, curious, and criminally cute",
-            'description': "You thrive on vibes and soft blankets. Youre a gentle introvert who still knows how to steal the spotlight  mostly with snacks.",
-            'traits': ['Cozy-core', 'Snack-forward', 'Camera-ready'],
-        },
-        {
-            'name': 'Otter',
-            'emoji': '🦦',
-            'tagline': "Play first, plan… eventually",
-            'description': "Youre collaborative, chaotic-good, and find joy in little things (like holding hands and river slides).",
-            'traits': ['Playful', 'Social', 'Inventive'],
-        },
-        {
-            'name': 'Quokka',
-            'emoji': '🦘',
-            'tagline': "A smile with legs",
-            'description': "Your optimism is contagious and slightly suspicious. People feel safer just by standing near you.",
-            'traits': ['Optimistic', 'Disarming', 'Unflappable'],
-        },
-        {
-            'name': 'Axolotl',
-            'emoji': '🦎',
-            'tagline': "Soft chaos scientist",
-            'description': "Youre adaptable, adorable, and unbothered. If vibes were a PhD, youd be tenured.",
-            'traits': ['Adaptive', 'Serene', 'Mysteriously wise'],
-        },
-        {
-            'name': 'Corgi',
-            'emoji': '🐶',
-            'tagline': "Short king energy",
-            'description': "You lead with enthusiasm and snack diplomacy. Your calendar is 50% walks, 50% parties.",
-            'traits': ['Loyal', 'Upbeat', 'Snack-positive'],
-        },
-        {
-            'name': 'Penguin',
-            'emoji': '🐧',
-            'tagline': "Formalwear, informal chaos",
-            'description': "Youre elegant under pressure and hilarious on land. Teamwork is your superpower.",
-            'traits': ['Graceful', 'Team-first', 'Resilient'],
-        },
-    ]
-
-    idx = seed % len(animal_profiles)
-    return animal_profiles[idx]
+    # Stable across processes, unlike the randomized built-in hash()
+    seed = zlib.crc32(orjson.dumps(answers, option=orjson.OPT_SORT_KEYS))
+    return ANIMAL_PROFILES[seed % len(ANIMAL_PROFILES)]
 
 
 @app.route('/api/test', methods=['GET', 'POST', 'PUT'])
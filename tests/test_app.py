@@ -0,0 +1,170 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Keep the tracked monitor.db and logs/ untouched while importing the app
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault('DB_PATH', os.path.join(_tmp, 'monitor.db'))
+os.environ.setdefault('LOG_DIR', os.path.join(_tmp, 'logs'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+@app.app.route('/test/mutate-json', methods=['POST'])
+def mutate_json():
+    app.request.get_json()['password'] = 'changed-by-view'
+    return {}
+
+
+def wait_for_log(text, timeout=5):
+    log_path = os.path.join(app.LOG_DIR, 'app.log')
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with open(log_path) as f:
+            contents = f.read()
+        if text in contents:
+            return contents
+        time.sleep(0.05)
+    raise AssertionError(f'{text!r} was not written to the log')
+
+
+def test_json_message_falls_back_for_integers_beyond_64_bits():
+    data = {'json_body': {'big': 123456789012345678901234567890}}
+    assert json.loads(str(app.JSONMessage(data))) == data
+
+
+def test_json_message_falls_back_for_deep_nesting():
+    data = {'json_body': json.loads('[' * 300 + ']' * 300)}
+    assert json.loads(str(app.JSONMessage(data))) == data
+
+
+def test_big_integer_body_is_still_logged():
+    # pytest's log capture keeps basicConfig from raising the root level
+    app.logger.setLevel(logging.INFO)
+    client = app.app.test_client()
+    response = client.post(
+        '/api/test', data='{"big": 123456789012345678901234567890}',
+        content_type='application/json')
+    assert response.status_code == 200
+    wait_for_log('123456789012345678901234567890')
+
+
+def test_log_shows_json_body_as_received_after_view_mutates_it():
+    app.logger.setLevel(logging.INFO)
+    client = app.app.test_client()
+    # pytest attaches its capture handlers to every logger, which would
+    # format the record on the request thread; keep only the queue handler
+    # and hold records in the queue until the view has run, as under load
+    handlers = app.logger.handlers[:]
+    app.logger.handlers = [
+        h for h in handlers if isinstance(h, app.DeferredQueueHandler)]
+    app.log_listener.stop()
+    try:
+        response = client.post(
+            '/test/mutate-json', json={'password': 'sent-by-client'})
+    finally:
+        app.log_listener.start()
+        app.logger.handlers = handlers
+    assert response.status_code == 200
+    contents = wait_for_log('sent-by-client')
+    import re; print('CONTENTS', re.findall(r'.json_body.{0,60}', contents)); assert 'changed-by-view' not in contents
+
+
+def parse_user_agent(ua):
+    with app.app.test_request_context(headers={'User-Agent': ua}):
+        return app.parse_user_agent()
+
+
+def test_user_agent_tokens_may_overlap():
+    assert parse_user_agent('Safariphone')['is_mobile']
+    assert parse_user_agent('ChromEdge')['browser'] == 'Edge'
+
+
+def test_user_agent_browser_priority():
+    ua = ('Mozilla/5.0 (Windows NT 10.0) AppleWebKit/537.36 '
+          '(KHTML, like Gecko) Chrome/120.0 Safari/537.36 Edg/120.0')
+    info = parse_user_agent(ua)
+    assert info['browser'] == 'Chrome'
+    assert not info['is_mobile'] and not info['is_bot']
+
+
+def query(sql, *params):
+    with app.db_lock:
+        return app.db.execute(sql, params).fetchall()
+
+
+def wait_for_writer_idle():
+    deadline = time.monotonic() + 5
+    while not app.write_queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Let a batch already taken off the queue hit its flush deadline
+    time.sleep(app.LOG_FLUSH_INTERVAL * 3)
+
+
+def test_rows_from_several_requests_share_one_batch(monkeypatch):
+    wait_for_writer_idle()
+    batch_sizes = []
+    write_rows = app.write_rows
+
+    def recording_write_rows(items):
+        batch_sizes.append(len(items))
+        write_rows(items)
+
+    monkeypatch.setattr(app, 'write_rows', recording_write_rows)
+    monkeypatch.setattr(app, 'LOG_BATCH_SIZE', 3)
+    monkeypatch.setattr(app, 'LOG_FLUSH_INTERVAL', 5)
+    client = app.app.test_client()
+    for i in range(3):
+        client.get(f'/?batch={i}')
+
+    deadline = time.monotonic() + 5
+    while not batch_sizes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert batch_sizes == [3]
+    rows = query(
+        "SELECT query_json FROM request_logs WHERE query_json LIKE '%batch%'")
+    assert len(rows) == 3
+
+
+def test_stop_db_writer_writes_rows_already_dequeued(monkeypatch):
+    wait_for_writer_idle()
+    # The writer takes the row, then waits for more until stopped
+    monkeypatch.setattr(app, 'LOG_FLUSH_INTERVAL', 30)
+    app.app.test_client().get('/?stop=pending')
+    deadline = time.monotonic() + 5
+    while not app.write_queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not query(
+        "SELECT id FROM request_logs WHERE query_json LIKE '%pending%'")
+
+    try:
+        app.stop_db_writer()
+        assert not app.db_writer_thread.is_alive()
+        assert query(
+            "SELECT id FROM request_logs WHERE query_json LIKE '%pending%'")
+    finally:
+        app.db_writer_thread = threading.Thread(
+            target=app.db_writer, daemon=True)
+        app.db_writer_thread.start()
+
+
+def test_prune_keeps_exactly_log_retain_rows(monkeypatch):
+    wait_for_writer_idle()
+    monkeypatch.setattr(app, 'LOG_RETAIN_ROWS', 3)
+    app.write_rows([
+        (app.INSERT_REQUEST_LOG_SQL,
+         (time.time_ns(), 'GET', f'/prune/{i}', 200,
+          None, None, None, None, None, None))
+        for i in range(10)
+    ])
+
+    app.prune_request_logs()
+
+    rows = query('SELECT path FROM request_logs ORDER BY id')
+    assert [row['path'] for row in rows] == [
+        '/prune/7', '/prune/8', '/prune/9']